@@ -19,7 +19,7 @@ export const CurrentLocation = ({ detection, snapshotPath }: CurrentLocationProp
         <div className="current-detection">
           <div className="current-image">
             <img 
-              src={`http://localhost:8000/api/assets/${snapshotPath}`} 
+              src={`http://localhost:8000/api/snapshots/${snapshotPath}?width=320&format=webp`} 
               alt="Current Detection" 
               className="detection-image"
             />
@@ -58,7 +58,7 @@ export const DetectionCarousel = ({ snapshots }: DetectionCarouselProps) => {
         
         <div className="carousel-container">
           <img 
-            src={`http://localhost:8000/api/assets/${snapshots[currentIndex]}`} 
+            src={`http://localhost:8000/api/snapshots/${snapshots[currentIndex]}?width=320&format=webp`} 
             alt={`Detection ${currentIndex + 1} of ${snapshots.length}`} 
             className="detection-image"
           />
@@ -0,0 +1,12 @@
+"""
+Analytics package for aggregate views over stored detections.
+
+This package provides:
+- Occupancy heatmaps per camera (pixel space) and on the floorplan
+"""
+
+from app.analytics.heatmaps import HeatmapService
+
+__all__ = [
+    "HeatmapService"
+]
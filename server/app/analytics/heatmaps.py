@@ -0,0 +1,334 @@
+"""
+Dwell-weighted occupancy heatmaps.
+
+Heatmaps are NumPy 2D histograms of detection positions weighted by dwell
+time (seconds until the camera's next detection). They are computed per
+day - matching the detection table's daily partitions - and cached along
+with a cheap per-day (count, max id) fingerprint, so a multi-day heatmap only
+rescans days that changed (new detections, backfills, retention) and merges
+cached partial histograms by summing them.
+
+Floorplan heatmaps project each detection's ground point (bottom-center of
+its box) through a per-camera perspective transform configured with
+``FLOORPLAN_CONFIG``, e.g.::
+
+    {"width": 1000, "height": 800, "bins": [100, 80],
+     "cameras": {"office": {"room": "office",
+                            "image_points": [[x, y], ...4],
+                            "floor_points": [[x, y], ...4]}}}
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+from sqlmodel import func, select
+
+from app.db import get_session
+from app.models import Detection
+from app.rtsp.stream import RTSPStream
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# camera_id -> (pixel histogram, floorplan histogram or None)
+DayPartial = Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]
+# (row count, max id) of a day's matching detections
+Fingerprint = Tuple[int, int]
+# (day, model_id, class_name)
+CacheKey = Tuple[date, Optional[str], Optional[str]]
+
+
+def dwell_times(timestamps: np.ndarray, max_dwell: float, interval: float) -> np.ndarray:
+    """Seconds each detection "lasted" - the gap to the next distinct timestamp.
+
+    Detections sharing a timestamp (several boxes in one frame) share that
+    frame's dwell. Frames followed by a gap longer than ``max_dwell`` (the
+    pet left, or a stray box) and the last frame are credited the typical
+    sampling interval - the median of the regular gaps - so isolated
+    detections don't outweigh frames inside a continuous run.
+
+    Args:
+        timestamps: Sorted epoch seconds for a single camera
+        max_dwell: Longest gap still counted as continuous presence
+        interval: Sampling interval to credit when there are no regular gaps
+
+    Returns:
+        Dwell seconds per detection
+    """
+    unique, inverse = np.unique(timestamps, return_inverse=True)
+    gaps = np.diff(unique)
+    regular = gaps[gaps <= max_dwell]
+    typical = float(np.median(regular)) if regular.size else interval
+    dwell = np.append(np.where(gaps <= max_dwell, gaps, typical), typical)
+    return dwell[inverse]
+
+
+def project(points: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Apply a 3x3 perspective transform to an (N, 2) array of points."""
+    homogeneous = np.hstack([points, np.ones((len(points), 1))]) @ matrix.T
+    return homogeneous[:, :2] / homogeneous[:, 2:3]
+
+
+def encode_rle(heatmap: np.ndarray) -> dict:
+    """Quantize a heatmap to uint8 (relative to its max) and run-length encode it."""
+    peak = float(heatmap.max()) if heatmap.size else 0.0
+    quantized = (
+        np.rint(heatmap / peak * 255).astype(np.uint8) if peak > 0
+        else np.zeros(heatmap.shape, np.uint8)
+    )
+    flat = quantized.ravel()
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(flat)) + 1))
+    lengths = np.diff(np.append(starts, flat.size))
+    return {
+        "shape": list(heatmap.shape),
+        "encoding": "rle-u8",
+        "max_seconds": peak,
+        "total_seconds": float(heatmap.sum()),
+        "values": flat[starts].tolist(),
+        "lengths": lengths.tolist(),
+    }
+
+
+class HeatmapService:
+    """Singleton that computes and caches per-day heatmap partials."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        bins = os.getenv("HEATMAP_BINS", "64x48").lower().split("x")
+        self.pixel_bins = (int(bins[1]), int(bins[0]))  # (rows, cols)
+        self.frame_size = (RTSPStream.HEIGHT, RTSPStream.WIDTH)
+        self.max_dwell = float(os.getenv("HEATMAP_MAX_DWELL", 10))
+        self.interval = float(os.getenv("INTERVAL", 1.0))
+        self.cache_size = int(os.getenv("HEATMAP_CACHE_DAYS", 400))
+        self.default_model_id = os.getenv("ROBOFLOW_MODEL_ID") or None
+
+        self.floorplan = self._load_floorplan()
+
+        # key -> (fingerprint, DayPartial), least recently used first
+        self._cache: "OrderedDict[CacheKey, Tuple[Fingerprint, DayPartial]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._initialized = True
+
+    @staticmethod
+    def _load_floorplan() -> Optional[dict]:
+        """Parse FLOORPLAN_CONFIG into sizes and per-camera transforms."""
+        raw = os.getenv("FLOORPLAN_CONFIG")
+        if not raw:
+            return None
+
+        try:
+            config = json.loads(raw)
+            cameras = {
+                camera_id: {
+                    "room": cam.get("room", camera_id),
+                    "matrix": cv2.getPerspectiveTransform(
+                        np.float32(cam["image_points"]), np.float32(cam["floor_points"])
+                    ).astype(np.float64),
+                }
+                for camera_id, cam in config["cameras"].items()
+            }
+            cols, rows = config.get("bins", [100, 100])
+            return {
+                "size": (float(config["height"]), float(config["width"])),
+                "bins": (int(rows), int(cols)),
+                "cameras": cameras,
+            }
+        except (json.JSONDecodeError, KeyError, ValueError, cv2.error) as e:
+            logger.error(f"Error: FLOORPLAN_CONFIG is invalid ({e}); floorplan heatmaps disabled")
+            return None
+
+    def _histogram(self, xs, ys, weights, size, bins) -> np.ndarray:
+        hist, _, _ = np.histogram2d(
+            ys, xs,
+            bins=bins,
+            range=[[0, size[0]], [0, size[1]]],
+            weights=weights,
+        )
+        return hist.astype(np.float32)
+
+    @staticmethod
+    def _filter(query, model_id: Optional[str], class_name: Optional[str]):
+        """Restrict a query to one model (live detections only if None) and class."""
+        if model_id:
+            query = query.where(Detection.model_id == model_id)
+        else:
+            # Replays are stored under replay:* and would double count footage
+            query = query.where(Detection.model_id.notlike("replay:%"))
+        if class_name:
+            query = query.where(Detection.class_name == class_name)
+        return query
+
+    def _fingerprints(
+        self,
+        first: date,
+        last: date,
+        model_id: Optional[str],
+        class_name: Optional[str],
+    ) -> Dict[date, Fingerprint]:
+        """Cheap per-day (count, max id) probe used to validate cached days.
+
+        Backfills and retention change past days, so a cached day is only
+        reused while its fingerprint is unchanged.
+        """
+        day = func.date_trunc("day", Detection.timestamp).label("day")
+        query = self._filter(
+            select(day, func.count(), func.max(Detection.id))
+            .where(Detection.timestamp >= datetime.combine(first, time.min))
+            .where(Detection.timestamp < datetime.combine(last + timedelta(days=1), time.min))
+            .group_by(day),
+            model_id,
+            class_name,
+        )
+        with get_session() as session:
+            rows = session.execute(query).all()
+        return {row[0].date(): (row[1], row[2]) for row in rows}
+
+    def _compute_day(
+        self,
+        day: date,
+        model_id: Optional[str],
+        class_name: Optional[str],
+    ) -> DayPartial:
+        """Query one day of detections and build per-camera histograms."""
+        start = datetime.combine(day, time.min)
+        query = (
+            select(
+                Detection.camera_id,
+                Detection.timestamp,
+                Detection.x,
+                Detection.y,
+                Detection.height,
+            )
+            .where(Detection.timestamp >= start)
+            .where(Detection.timestamp < start + timedelta(days=1))
+            .order_by(Detection.camera_id, Detection.timestamp)
+        )
+        query = self._filter(query, model_id, class_name)
+
+        with get_session() as session:
+            rows = session.execute(query).all()
+
+        partial: DayPartial = {}
+        if not rows:
+            return partial
+
+        camera_ids = np.array([row[0] for row in rows])
+        ts = np.fromiter((row[1].timestamp() for row in rows), np.float64, len(rows))
+        coords = np.array([row[2:] for row in rows], np.float64)  # x, y, height
+
+        # Rows are sorted by camera, so each camera is a contiguous slice
+        boundaries = np.flatnonzero(camera_ids[1:] != camera_ids[:-1]) + 1
+        for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, len(rows)]):
+            camera_id = str(camera_ids[lo])
+            x, y, h = coords[lo:hi].T
+            dwell = dwell_times(ts[lo:hi], self.max_dwell, self.interval)
+
+            pixel = self._histogram(x, y, dwell, self.frame_size, self.pixel_bins)
+
+            floor = None
+            if self.floorplan and (cam := self.floorplan["cameras"].get(camera_id)):
+                ground = project(np.column_stack([x, y + h / 2]), cam["matrix"])
+                floor = self._histogram(
+                    ground[:, 0], ground[:, 1], dwell,
+                    self.floorplan["size"], self.floorplan["bins"],
+                )
+
+            partial[camera_id] = (pixel, floor)
+        return partial
+
+    def _day_partial(
+        self,
+        key: CacheKey,
+        fingerprint: Optional[Fingerprint],
+    ) -> DayPartial:
+        """Return a day's partial histograms, recomputing only if the day changed."""
+        if fingerprint is None:
+            # No matching rows (or the partition was dropped)
+            with self._lock:
+                self._cache.pop(key, None)
+            return {}
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == fingerprint:
+                self._cache.move_to_end(key)
+                return cached[1]
+
+        partial = self._compute_day(*key)
+
+        with self._lock:
+            self._cache[key] = (fingerprint, partial)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return partial
+
+    def _partials(self, days: int, model_id: Optional[str], class_name: Optional[str]):
+        model_id = model_id or self.default_model_id
+        today = date.today()
+        fingerprints = self._fingerprints(
+            today - timedelta(days=days - 1), today, model_id, class_name
+        )
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            yield self._day_partial((day, model_id, class_name), fingerprints.get(day))
+
+    def camera_heatmap(
+        self,
+        camera_id: str,
+        days: int = 7,
+        model_id: Optional[str] = None,
+        class_name: Optional[str] = None,
+    ) -> np.ndarray:
+        """Dwell-weighted heatmap for one camera in pixel space.
+
+        ``model_id`` defaults to ROBOFLOW_MODEL_ID (or all non-replay models).
+        """
+        total = np.zeros(self.pixel_bins, np.float32)
+        for partial in self._partials(days, model_id, class_name):
+            if camera_id in partial:
+                total += partial[camera_id][0]
+        return total
+
+    def floorplan_heatmap(
+        self,
+        room: Optional[str] = None,
+        days: int = 7,
+        model_id: Optional[str] = None,
+        class_name: Optional[str] = None,
+    ) -> np.ndarray:
+        """Dwell-weighted heatmap on the floorplan, optionally for a single room.
+
+        ``model_id`` defaults to ROBOFLOW_MODEL_ID (or all non-replay models).
+
+        Raises:
+            ValueError: If FLOORPLAN_CONFIG isn't configured
+        """
+        if not self.floorplan:
+            raise ValueError("FLOORPLAN_CONFIG is not configured")
+
+        cameras = {
+            camera_id for camera_id, cam in self.floorplan["cameras"].items()
+            if room is None or cam["room"] == room
+        }
+        total = np.zeros(self.floorplan["bins"], np.float32)
+        for partial in self._partials(days, model_id, class_name):
+            for camera_id in cameras & partial.keys():
+                total += partial[camera_id][1]
+        return total
@@ -0,0 +1,270 @@
+"""
+Runtime camera management.
+
+This module provides:
+- load_camera_configs: reads camera configs from CAM_CONFIG_FILE or CAM_PROXY_CONFIG
+- detector_settings: resolves a camera's detector settings against env defaults
+- tiling_defaults: reads and checks the DETECTOR_TILE_* defaults
+- CameraRegistry: applies camera configs diff-by-diff to the running stream
+  and detector managers (singleton), so changing one camera never restarts
+  the others
+- CameraConfigWatcher: polls CAM_CONFIG_FILE and applies it when it changes
+"""
+
+import asyncio, json, os, threading
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models import CameraConfig
+from app.roboflow.detector import RoboflowDetectorManager
+from app.rtsp.stream import RTSPStreamManager
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def load_camera_configs() -> List[CameraConfig]:
+    """Load camera configs from CAM_CONFIG_FILE if it exists, else CAM_PROXY_CONFIG.
+
+    Raises:
+        ValueError: If the config isn't valid JSON or an entry is invalid
+    """
+    config_file = os.getenv("CAM_CONFIG_FILE")
+    if config_file and os.path.exists(config_file):
+        with open(config_file) as f:
+            raw = f.read()
+    else:
+        raw = os.getenv('CAM_PROXY_CONFIG', '[]')
+
+    tiling_defaults()  # fail up front rather than on every camera start
+
+    try:
+        return [CameraConfig(**cam) for cam in json.loads(raw)]
+    except json.JSONDecodeError as e:
+        raise ValueError(f"camera config is not valid JSON: {e}")
+    except (ValidationError, TypeError) as e:
+        raise ValueError(f"invalid camera config (each needs 'name' and 'stream_url'): {e}")
+
+
+def tiling_defaults() -> Tuple[int, float]:
+    """Read DETECTOR_TILE_SIZE / DETECTOR_TILE_OVERLAP.
+
+    Raises:
+        ValueError: If the size is negative or the overlap is outside [0, 1)
+    """
+    tile_size = int(os.getenv("DETECTOR_TILE_SIZE", 0))
+    tile_overlap = float(os.getenv("DETECTOR_TILE_OVERLAP", 0.2))
+    if tile_size < 0:
+        raise ValueError(f"DETECTOR_TILE_SIZE must be >= 0, got {tile_size}")
+    if not 0 <= tile_overlap < 1:
+        raise ValueError(f"DETECTOR_TILE_OVERLAP must be in [0, 1), got {tile_overlap}")
+    return tile_size, tile_overlap
+
+
+def detector_settings(config: CameraConfig) -> dict:
+    """Resolve a camera's detector settings, falling back to env defaults."""
+    def pick(value, env, default):
+        return value if value is not None else os.getenv(env, default)
+
+    tile_size, tile_overlap = tiling_defaults()
+
+    return {
+        "model_id": config.model_id or os.getenv("ROBOFLOW_MODEL_ID"),
+        "confidence_threshold": float(pick(config.confidence_threshold, "CONFIDENCE_THRESHOLD", "0.9")),
+        "interval": float(pick(config.interval, "INTERVAL", 1.0)),
+        "rois": config.roi,
+        "tile_size": config.tile_size if config.tile_size is not None else tile_size,
+        "tile_overlap": config.tile_overlap if config.tile_overlap is not None else tile_overlap,
+    }
+
+
+class CameraRegistry:
+    """Singleton that keeps running streams / detectors in sync with camera configs."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.configs: Dict[str, CameraConfig] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.RLock()
+        self._initialized = True
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Load the configured cameras and start them."""
+        self.loop = loop
+        try:
+            self.apply(load_camera_configs())
+        except ValueError as e:
+            logger.error(f"Error: {e}")
+
+    def _start_camera(self, config: CameraConfig) -> None:
+        stream = RTSPStreamManager().add_stream(config.name, config.stream_url)
+        try:
+            RoboflowDetectorManager().add_detector(
+                stream=stream, loop=self.loop, **detector_settings(config)
+            )
+        except Exception:
+            # Don't leave a stream running without its detector
+            RTSPStreamManager().stop_stream(config.name)
+            raise
+
+    def _stop_camera(self, name: str) -> None:
+        RoboflowDetectorManager().stop_detector(name)
+        RTSPStreamManager().stop_stream(name)
+
+    def _apply_one(self, config: CameraConfig) -> Optional[str]:
+        """Bring a single camera in line with ``config``; returns the action taken.
+
+        The config is only recorded once the camera is running, so a failed
+        start is retried by the next apply instead of looking unchanged.
+        """
+        current = self.configs.get(config.name)
+
+        if current is None:
+            action = "added"
+        elif current.stream_url != config.stream_url:
+            # New source: restart this camera's stream and detector only
+            action = "restarted"
+        elif (settings := detector_settings(config)) != detector_settings(current):
+            if detector := RoboflowDetectorManager().get_detector(config.name):
+                detector.reconfigure(**settings)
+                self.configs[config.name] = config
+                return "reconfigured"
+            action = "restarted"  # detector is gone, so start it again
+        else:
+            return None
+
+        if current is not None:
+            self._stop_camera(config.name)
+            del self.configs[config.name]
+
+        self._start_camera(config)
+        self.configs[config.name] = config
+        return action
+
+    def apply(self, configs: List[CameraConfig]) -> Dict[str, List[str]]:
+        """Apply a full set of camera configs, touching only cameras that changed.
+
+        Returns:
+            Camera names grouped by action taken
+        """
+        changes: Dict[str, List[str]] = {
+            "added": [], "removed": [], "restarted": [], "reconfigured": [], "failed": []
+        }
+        with self._lock:
+            desired = {config.name: config for config in configs}
+            for name in list(self.configs):
+                if name not in desired:
+                    self._stop_camera(name)
+                    del self.configs[name]
+                    changes["removed"].append(name)
+
+            for config in desired.values():
+                try:
+                    action = self._apply_one(config)
+                except Exception as e:
+                    logger.error(f"Error applying config for camera {config.name}: {e}")
+                    changes["failed"].append(config.name)
+                    continue
+                if action:
+                    changes[action].append(config.name)
+
+        if any(changes.values()):
+            logger.info(f"Applied camera config: {changes}")
+        return changes
+
+    def upsert(self, config: CameraConfig) -> Optional[str]:
+        """Add or update a single camera; returns the action taken (None if unchanged).
+
+        Raises:
+            Exception: Whatever starting the stream / detector raised
+        """
+        with self._lock:
+            action = self._apply_one(config)
+            self._persist()
+        return action
+
+    def remove(self, name: str) -> bool:
+        """Stop and forget a single camera; returns False if it wasn't configured."""
+        with self._lock:
+            if name not in self.configs:
+                return False
+            self._stop_camera(name)
+            del self.configs[name]
+            self._persist()
+        return True
+
+    def _persist(self) -> None:
+        """Write API changes back to CAM_CONFIG_FILE so the watcher doesn't undo them."""
+        config_file = os.getenv("CAM_CONFIG_FILE")
+        if not config_file:
+            return
+
+        data = [config.model_dump(exclude_none=True) for config in self.configs.values()]
+        tmp_path = f"{config_file}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, config_file)
+
+    def stop_all(self) -> None:
+        """Stop every camera."""
+        with self._lock:
+            for name in list(self.configs):
+                self._stop_camera(name)
+            self.configs.clear()
+
+
+class CameraConfigWatcher:
+    """Polls CAM_CONFIG_FILE and applies it to the registry when it changes."""
+
+    def __init__(self, path: str, poll_interval: float = 2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._mtime: Optional[float] = None
+        self._stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def start(self) -> None:
+        """Start the watcher thread."""
+        self._mtime = self._current_mtime()
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        logger.info(f"Watching {self.path} for camera config changes")
+
+    def stop(self) -> None:
+        """Stop the watcher thread."""
+        self._stop.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5.0)
+
+    def _loop(self) -> None:
+        """Main polling loop."""
+        while not self._stop.wait(self.poll_interval):
+            mtime = self._current_mtime()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+
+            try:
+                CameraRegistry().apply(load_camera_configs())
+            except ValueError as e:
+                logger.error(f"Error: ignoring invalid {self.path}: {e}")
+            except Exception as e:
+                logger.error(f"Error applying camera config from {self.path}: {e}")
@@ -1,10 +1,29 @@
+import logging
+import os
 from sqlmodel import SQLModel, Session, create_engine
 
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 DATABASE_URL = "postgresql+psycopg2://postgres:postgres@db:5432/pettracker"
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, echo=False)
+
+# SQL statement logging is per-statement, so it's opt-in. Raising the logger
+# level (rather than echo=True, which adds its own stdout handler) sends it
+# through the queued app logging pipeline
+if os.getenv("SQL_ECHO", "false").lower() == "true":
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
 
 def init_db():
+    from app.storage.partitions import ensure_partitions, migrate_to_partitioned, table_kind
+
+    # create_all won't convert a pre-existing plain table, so migrate it first
+    if table_kind(engine) == "r":
+        migrate_to_partitioned(engine, SQLModel.metadata)
+
     SQLModel.metadata.create_all(engine)
+    ensure_partitions(engine)
 
 def get_session() -> Session:
-    return Session(engine)
\ No newline at end of file
+    return Session(engine)
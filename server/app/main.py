@@ -1,4 +1,4 @@
-import os, json
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -6,11 +6,14 @@ from dotenv import load_dotenv
 from contextlib import asynccontextmanager
 import asyncio
 
+from app.cameras import CameraRegistry, CameraConfigWatcher
 from app.db import init_db
+from app.routes.cameras import router as camera_router
 from app.routes.detections import router as detection_router
+from app.routes.heatmaps import router as heatmap_router
+from app.routes.snapshots import router as snapshot_router
 from app.routes.websockets import router as websocket_router
-from app.rtsp.stream import RTSPStreamManager
-from app.roboflow.detector import RoboflowDetectorManager
+from app.storage.retention import RetentionJob
 from app.utils.handlers import setup_handlers
 from app.utils.logger import get_logger
 
@@ -19,44 +22,60 @@ load_dotenv()
 
 logger = get_logger(__name__)
 
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "app/snapshots")
+
 def start_streams(loop):
-    """Initialize and start RTSP streams and detectors."""
-    CAMERA_STREAMS = os.getenv('CAM_PROXY_CONFIG', '[]')
-    camera_feeds = {}
-
-    try:
-        camera_config = json.loads(CAMERA_STREAMS)
-        camera_feeds = {cam['name']: cam['stream_url'] for cam in camera_config}
-    except json.JSONDecodeError:
-        logger.error("Error: CAMERA_STREAMS environment variable is not valid JSON")
-    except KeyError:
-        logger.error("Error: Each camera config must have 'name' and 'stream_url' fields")
-
-    # Get singleton managers
-    stream_manager = RTSPStreamManager()
-    detector_manager = RoboflowDetectorManager()
-
-    # Start streams and detectors
-    for camera_id, url in camera_feeds.items():
-        # Start stream
-        stream = stream_manager.add_stream(camera_id, url)
-        
-        # Start detector for this stream
-        detector_manager.add_detector(
-            stream=stream,
-            model_id=os.getenv("ROBOFLOW_MODEL_ID"),
-            confidence_threshold=float(os.getenv("CONFIDENCE_THRESHOLD", "0.9")),
-            interval=float(os.getenv("INTERVAL", 1.0)),
-            loop=loop
-        )
+    """Initialize and start RTSP streams and detectors.
+
+    Returns:
+        The config file watcher if CAM_CONFIG_FILE is set, else None
+    """
+    CameraRegistry().start(loop)
+
+    config_file = os.getenv("CAM_CONFIG_FILE")
+    if not config_file:
+        return None
+
+    watcher = CameraConfigWatcher(
+        config_file, poll_interval=float(os.getenv("CAM_CONFIG_POLL_INTERVAL", 2.0))
+    )
+    watcher.start()
+    return watcher
+
+def create_retention_job() -> RetentionJob:
+    """Build the detection / snapshot retention job from environment config."""
+    snapshot_max_mb = os.getenv("SNAPSHOT_MAX_MB")
+    clip_max_mb = os.getenv("CLIP_MAX_MB")
+    # 0 (or empty) disables age-based retention for both settings
+    snapshot_max_age = float(os.getenv("SNAPSHOT_RETENTION_DAYS", "14") or 0)
+    detection_retention_days = int(os.getenv("DETECTION_RETENTION_DAYS", "30") or 0)
+    if detection_retention_days < 0:
+        raise ValueError("DETECTION_RETENTION_DAYS must be 0 (keep everything) or a positive number of days")
+
+    return RetentionJob(
+        snapshot_dir=SNAPSHOT_DIR,
+        detection_retention_days=detection_retention_days or None,
+        partition_days_ahead=int(os.getenv("DETECTION_PARTITION_DAYS_AHEAD", "3")),
+        archive_partitions=os.getenv("DETECTION_ARCHIVE_PARTITIONS", "false").lower() == "true",
+        snapshot_max_age_days=snapshot_max_age if snapshot_max_age > 0 else None,
+        snapshot_max_bytes=int(float(snapshot_max_mb) * 1024 * 1024) if snapshot_max_mb else None,
+        clip_max_bytes=int(float(clip_max_mb) * 1024 * 1024) if clip_max_mb else None,
+        interval=float(os.getenv("RETENTION_INTERVAL", "3600")),
+    )
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     loop = asyncio.get_running_loop()
     init_db()
     await setup_handlers() # Initialize signal handlers before starting streams
-    start_streams(loop)
+    config_watcher = start_streams(loop)
+
+    retention_job = create_retention_job()
+    retention_job.start()
     yield
+    retention_job.stop()
+    if config_watcher:
+        config_watcher.stop()
 
 app = FastAPI(root_path="/api", lifespan=lifespan)
 
@@ -68,14 +87,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(camera_router)
 app.include_router(detection_router)
+app.include_router(heatmap_router)
+app.include_router(snapshot_router)
 app.include_router(websocket_router)
 
 @app.get("/")
 def root():
     return {"status": "Pet Tracker API is running"}
 
-SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "app/snapshots")
 app.mount(
     "/assets",
     StaticFiles(directory=SNAPSHOT_DIR),
@@ -4,6 +4,7 @@ Models package for the application.
 This package contains all SQLModel models used in the application.
 """
 
+from app.models.camera import CameraConfig
 from app.models.detection import Detection
 
-__all__ = ['Detection'] 
\ No newline at end of file
+__all__ = ['CameraConfig', 'Detection'] 
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Camera configuration model.
+
+This model describes a single camera entry of ``CAM_PROXY_CONFIG`` (or the
+``CAM_CONFIG_FILE`` it can be loaded from). Detector settings left unset
+fall back to the environment defaults.
+"""
+
+from numbers import Real
+from pydantic import field_validator
+from sqlmodel import SQLModel, Field
+from typing import Any, List, Optional
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, Real) and not isinstance(value, bool)
+
+
+def _is_point(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and len(value) == 2 and all(_is_number(v) for v in value)
+
+
+class CameraConfig(SQLModel):
+    """Configuration for one camera stream and its detector."""
+
+    name: str = Field(min_length=1, description="Unique camera ID")
+    stream_url: str = Field(min_length=1, description="RTSP URL to stream from")
+
+    # Detector overrides
+    model_id: Optional[str] = Field(default=None, description="Roboflow model ID (default ROBOFLOW_MODEL_ID)")
+    confidence_threshold: Optional[float] = Field(default=None, description="High confidence threshold (default CONFIDENCE_THRESHOLD)")
+    interval: Optional[float] = Field(default=None, description="Seconds between inference runs (default INTERVAL)")
+
+    # Regions of interest / tiling
+    roi: Optional[List[Any]] = Field(default=None, description="Rectangles [x1, y1, x2, y2] or polygons [[x, y], ...]")
+    tile_size: Optional[int] = Field(default=None, ge=0, description="Tile size (default DETECTOR_TILE_SIZE)")
+    tile_overlap: Optional[float] = Field(default=None, ge=0, lt=1, description="Tile overlap (default DETECTOR_TILE_OVERLAP)")
+
+    @field_validator("roi")
+    @classmethod
+    def check_roi(cls, value: Optional[List[Any]]) -> Optional[List[Any]]:
+        """Each ROI must be 4 numbers or a polygon of at least 3 [x, y] points."""
+        for roi in value or []:
+            if not isinstance(roi, (list, tuple)):
+                raise ValueError(f"ROI {roi!r} must be [x1, y1, x2, y2] or [[x, y], ...]")
+            if len(roi) == 4 and all(_is_number(v) for v in roi):
+                continue
+            if len(roi) >= 3 and all(_is_point(point) for point in roi):
+                continue
+            raise ValueError(f"ROI {roi!r} must be [x1, y1, x2, y2] or at least 3 [x, y] points")
+        return value
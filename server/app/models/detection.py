@@ -3,6 +3,9 @@ Detection model for storing pet detection events.
 
 This model represents a single pet detection event from the Roboflow model,
 including position, confidence, and metadata.
+
+The table is range-partitioned by day on ``timestamp`` (see
+``app.storage.partitions``), so ``timestamp`` is part of the primary key.
 """
 
 from sqlmodel import SQLModel, Field
@@ -13,12 +16,22 @@ from uuid import UUID
 
 class Detection(SQLModel, table=True):
     """A single pet detection event."""
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
     
-    id: Optional[int] = Field(default=None, primary_key=True)
+    id: Optional[int] = Field(
+        default=None,
+        primary_key=True,
+        sa_column_kwargs={"autoincrement": True},
+    )
     
     # Detection metadata
     detection_id: UUID = Field(description="Unique identifier for this detection from Roboflow")
-    timestamp: datetime = Field(description="When the detection was made")
+    timestamp: datetime = Field(
+        primary_key=True,
+        index=True,
+        description="When the detection was made (partition key)",
+    )
     model_id: str = Field(description="ID of the Roboflow model that made the detection")
     
     # Camera info
@@ -33,4 +46,4 @@ class Detection(SQLModel, table=True):
     
     # Classification
     class_name: str = Field(description="Class name of detected object (e.g. 'pets')")
-    class_id: int = Field(description="Numeric ID of the detected class") 
\ No newline at end of file
+    class_id: int = Field(description="Numeric ID of the detected class")
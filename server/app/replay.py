@@ -0,0 +1,319 @@
+"""
+Offline replay / backfill of recorded video.
+
+Feeds recorded files through the same stream → detector → signal path as
+the live pipeline, but as fast as the inference backend allows: frames are
+sampled every ``--interval`` seconds of *video* time and stamped with
+simulated timestamps, one worker per file runs in parallel, and detections
+are written to the database in bulk under a separate model_id namespace
+(``replay:<model_id>`` by default).
+
+Each file's first frame is stamped with its own ``@START`` if given, else
+``--start``, else the file's mtime minus its duration (from ffprobe).
+
+Usage:
+    python -m app.replay --model-id home-pet-detection/4 \\
+        office=/recordings/office.mp4@2026-10-12T08:00:00 \\
+        kitchen=/recordings/kitchen.mp4
+"""
+
+import argparse, asyncio, os, subprocess, threading, time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy import insert
+
+from app.cameras import detector_settings, load_camera_configs
+from app.db import engine, get_session, init_db
+from app.models import CameraConfig, Detection
+from app.roboflow.detector import RoboflowDetector
+from app.rtsp.stream import FileStream
+from app.storage.partitions import ensure_partitions, is_partitioned
+from app.utils.logger import get_logger
+from app.utils.signals import detection_made
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+class BulkDetectionWriter:
+    """Collects detections from ``detection_made`` and inserts them in batches."""
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+        self.rows: List[dict] = []
+        self.written = 0
+        self._days: Set[date] = set()
+        self._partitioned = is_partitioned(engine)
+
+    async def handle(self, sender, frame, **kwargs):
+        """``detection_made`` receiver."""
+        self.rows.append(kwargs)
+        if len(self.rows) >= self.batch_size:
+            rows, self.rows = self.rows, []
+            await asyncio.to_thread(self._insert, rows)
+
+    def flush(self) -> None:
+        """Insert any pending detections."""
+        rows, self.rows = self.rows, []
+        self._insert(rows)
+
+    def _insert(self, rows: List[dict]) -> None:
+        """Insert a batch of detections in a single statement."""
+        if not rows:
+            return
+
+        # Replayed footage is usually older than the pre-created partitions
+        if self._partitioned:
+            days = {row["timestamp"].date() for row in rows} - self._days
+            if days:
+                ensure_partitions(engine, start=min(days), end=max(days))
+                self._days |= days
+
+        with get_session() as session:
+            session.execute(insert(Detection), rows)
+            session.commit()
+        self.written += len(rows)
+
+
+class ReplayDetector(RoboflowDetector):
+    """Runs a detector over a FileStream frame by frame instead of on a timer."""
+
+    def __init__(self, stream: FileStream, namespace: str, **kwargs):
+        super().__init__(stream=stream, **kwargs)
+        self.record_model_id = namespace
+        self.frames = 0
+
+    def start(self) -> None:
+        """Run the replay on a background thread (see ``run()``)."""
+        if self.running:
+            logger.warning(f"Replay for {self.camera_id} already running")
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        """Process every sampled frame of the file, then return."""
+        self.running = True
+        for timestamp, frame in self.stream.frames():
+            if not self.running:
+                break
+            try:
+                if predictions := self._infer(frame):
+                    coro = self._process_predictions(predictions, frame, timestamp=timestamp)
+                    # Wait so a slow DB applies back-pressure to the reader
+                    asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+            except Exception as e:
+                logger.error(f"[{self.camera_id}] error processing frame at {timestamp}: {e}")
+            self.frames += 1
+        self.running = False
+
+    def stop(self) -> None:
+        """Stop decoding and wait for the replay thread, if any."""
+        self.stream.stop()
+        super().stop()
+
+
+def recording_start(path: str) -> datetime:
+    """Estimate when a recording started: its mtime (when it finished) minus its duration.
+
+    Raises:
+        ValueError: If ffprobe is missing or can't read the file's duration
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                path,
+            ],
+            capture_output=True,
+            text=True,
+        )
+        duration = float(result.stdout.strip())
+    except FileNotFoundError:
+        reason = "ffprobe not installed"
+    except ValueError:
+        reason = result.stderr.strip() or "no duration"
+    else:
+        return datetime.fromtimestamp(os.path.getmtime(path)) - timedelta(seconds=duration)
+
+    raise ValueError(
+        f"can't determine the duration of {path} ({reason}); "
+        "pass a start time with CAMERA=PATH@START or --start"
+    )
+
+
+def _camera_configs() -> Dict[str, CameraConfig]:
+    """Live camera configs (for ROI / tiling settings), if available."""
+    try:
+        return {config.name: config for config in load_camera_configs()}
+    except ValueError:
+        return {}
+
+
+async def replay(
+    files: Dict[str, str],
+    model_id: str,
+    namespace: Optional[str] = None,
+    start: Optional[datetime] = None,
+    starts: Optional[Dict[str, datetime]] = None,
+    interval: float = 1.0,
+    confidence_threshold: float = 0.9,
+    workers: int = 4,
+    batch_size: int = 500,
+) -> dict:
+    """Replay recorded files through the detector and store detections in bulk.
+
+    Args:
+        files: camera_id -> path of the recording
+        model_id: Roboflow model ID to run
+        namespace: model_id stored with detections. Defaults to ``replay:<model_id>``
+        start: Simulated capture time of each file's first frame.
+            Defaults to the file's mtime minus its duration
+        starts: camera_id -> capture time of that file's first frame (overrides ``start``)
+        interval: Seconds of video time between sampled frames
+        confidence_threshold: Minimum confidence for high confidence detections
+        workers: Number of files processed in parallel
+        batch_size: Detections per bulk insert
+
+    Returns:
+        Summary with frame / detection counts and throughput
+
+    Raises:
+        ValueError: If a file's start time isn't given and can't be probed
+    """
+    loop = asyncio.get_running_loop()
+
+    # Resolve every start time up front so a bad file fails before any work
+    starts = starts or {}
+    start_times = {
+        camera_id: starts.get(camera_id) or start or recording_start(path)
+        for camera_id, path in files.items()
+    }
+    namespace = namespace or f"replay:{model_id}"
+    configs = _camera_configs()
+
+    writer = BulkDetectionWriter(batch_size=batch_size)
+    detection_made.connect(writer.handle)
+
+    detectors = []
+    for camera_id, path in files.items():
+        config = configs.get(camera_id, CameraConfig(name=camera_id, stream_url=path))
+        settings = detector_settings(config)
+        stream = FileStream(
+            camera_id,
+            path,
+            start_time=start_times[camera_id],
+            interval=interval,
+        )
+        detectors.append(ReplayDetector(
+            stream,
+            namespace=namespace,
+            model_id=model_id,
+            confidence_threshold=confidence_threshold,
+            interval=interval,
+            loop=loop,
+            rois=settings["rois"],
+            tile_size=settings["tile_size"],
+            tile_overlap=settings["tile_overlap"],
+        ))
+
+    semaphore = asyncio.Semaphore(workers)
+    started = time.monotonic()
+
+    async def run(detector: ReplayDetector):
+        async with semaphore:
+            await asyncio.to_thread(detector.run)
+            if detector.stream.error:
+                logger.error(f"[{detector.camera_id}] replay failed after {detector.frames} frames")
+            else:
+                logger.info(f"[{detector.camera_id}] replay finished: {detector.frames} frames")
+
+    async def report():
+        while True:
+            await asyncio.sleep(5)
+            frames = sum(d.frames for d in detectors)
+            elapsed = time.monotonic() - started
+            logger.info(f"replay: {frames} frames, {frames / elapsed:.1f} frames/s, {writer.written} detections written")
+
+    reporter = asyncio.create_task(report())
+    try:
+        await asyncio.gather(*(run(d) for d in detectors))
+    finally:
+        reporter.cancel()
+        for detector in detectors:
+            detector.stop()
+        await asyncio.to_thread(writer.flush)
+        detection_made.disconnect(writer.handle)
+
+    elapsed = time.monotonic() - started
+    frames = sum(d.frames for d in detectors)
+    summary = {
+        "namespace": namespace,
+        "files": len(files),
+        "failed": [d.camera_id for d in detectors if d.stream.error],
+        "frames": frames,
+        "detections": writer.written,
+        "seconds": round(elapsed, 2),
+        "frames_per_second": round(frames / elapsed, 2) if elapsed else 0.0,
+    }
+    logger.info(f"replay complete: {summary}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded video through the detector")
+    parser.add_argument("files", nargs="+", metavar="CAMERA=PATH[@START]", help="Recording for a camera, optionally with its ISO start time")
+    parser.add_argument("--model-id", default=os.getenv("ROBOFLOW_MODEL_ID"), help="Roboflow model ID")
+    parser.add_argument("--namespace", help="model_id stored with detections (default replay:<model-id>)")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Capture time of each file's first frame (default: file mtime minus its duration)")
+    parser.add_argument("--interval", type=float, default=float(os.getenv("INTERVAL", 1.0)), help="Seconds of video between sampled frames")
+    parser.add_argument("--confidence-threshold", type=float, default=float(os.getenv("CONFIDENCE_THRESHOLD", "0.9")))
+    parser.add_argument("--workers", type=int, default=4, help="Files processed in parallel")
+    parser.add_argument("--batch-size", type=int, default=500, help="Detections per bulk insert")
+    args = parser.parse_args(argv)
+
+    if not args.model_id:
+        parser.error("--model-id or ROBOFLOW_MODEL_ID is required")
+
+    files, starts = {}, {}
+    for spec in args.files:
+        camera_id, sep, path = spec.partition("=")
+        if not sep or not camera_id or not path:
+            parser.error(f"expected CAMERA=PATH[@START], got {spec!r}")
+
+        # A trailing @START is only taken as such if it parses as a timestamp
+        file_path, at, file_start = path.rpartition("@")
+        if at:
+            try:
+                starts[camera_id] = datetime.fromisoformat(file_start)
+                path = file_path
+            except ValueError:
+                pass
+        files[camera_id] = path
+
+    init_db()
+    try:
+        asyncio.run(replay(
+            files,
+            model_id=args.model_id,
+            namespace=args.namespace,
+            start=args.start,
+            starts=starts,
+            interval=args.interval,
+            confidence_threshold=args.confidence_threshold,
+            workers=args.workers,
+            batch_size=args.batch_size,
+        ))
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,21 @@
 Roboflow-based pet detector for processing RTSP streams.
 
 This module provides:
-- RoboflowDetector: Monitors a single RTSP stream and runs inference
+- RoboflowDetector: Monitors a single RTSP stream and runs inference,
+  optionally only on per-camera ROIs / tiles (see app.roboflow.regions)
 - RoboflowDetectorManager: Manages multiple detectors (singleton)
 """
 
 import threading
 import time
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence
 import asyncio
 
 from app.utils.logger import get_logger
 from app.utils.signals import detection_made, high_confidence_detection_made
 from app.roboflow.client import create_client
+from app.roboflow.regions import InferencePlan
 from app.rtsp.stream import RTSPStream
 
 logger = get_logger(__name__)
@@ -30,6 +32,9 @@ class RoboflowDetector:
         confidence_threshold: float = 0.9,
         interval: float = 1.0,
         loop: asyncio.AbstractEventLoop = None,
+        rois: Optional[List[Sequence]] = None,
+        tile_size: int = 0,
+        tile_overlap: float = 0.2,
     ):
         """Initialize the detector.
         
@@ -39,12 +44,19 @@ class RoboflowDetector:
             confidence_threshold: Minimum confidence for detections
             interval: Seconds between inference runs
             loop: asyncio.AbstractEventLoop to use for async operations
+            rois: Rectangles / polygons to restrict inference to (full frame if None)
+            tile_size: Split ROIs into square tiles of this size (0 disables tiling)
+            tile_overlap: Fraction of overlap between neighbouring tiles
         """
         self.stream = stream
         self.model_id = model_id
         self.confidence_threshold = confidence_threshold
         self.interval = interval
         self.loop = loop
+        self.plan = InferencePlan(rois=rois, tile_size=tile_size, tile_overlap=tile_overlap)
+
+        # model_id stored with detections (replay runs use their own namespace)
+        self.record_model_id = model_id
 
         # State
         self.running = False
@@ -71,14 +83,46 @@ class RoboflowDetector:
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=5.0)
 
-    async def _process_predictions(self, predictions: List[dict], frame) -> None:
+    def reconfigure(
+        self,
+        model_id: str,
+        confidence_threshold: float = 0.9,
+        interval: float = 1.0,
+        rois: Optional[List[Sequence]] = None,
+        tile_size: int = 0,
+        tile_overlap: float = 0.2,
+    ) -> None:
+        """Update detector settings in place; takes effect from the next frame.
+
+        Args:
+            model_id: Roboflow model ID
+            confidence_threshold: Minimum confidence for detections
+            interval: Seconds between inference runs
+            rois: Rectangles / polygons to restrict inference to
+            tile_size: Split ROIs into square tiles of this size (0 disables tiling)
+            tile_overlap: Fraction of overlap between neighbouring tiles
+        """
+        self.plan = InferencePlan(rois=rois, tile_size=tile_size, tile_overlap=tile_overlap)
+        self.model_id = model_id
+        self.record_model_id = model_id
+        self.confidence_threshold = confidence_threshold
+        self.interval = interval
+        logger.info(f"[{self.camera_id}] detector reconfigured")
+
+    async def _process_predictions(
+        self,
+        predictions: List[dict],
+        frame,
+        timestamp: Optional[datetime] = None,
+    ) -> None:
         """Process a list of predictions and emit appropriate signals.
         
         Args:
             predictions: List of prediction dictionaries from Roboflow
             frame: The frame the predictions were made on
+            timestamp: When the frame was captured. Defaults to now
         """
-        current_time = datetime.now()
+        current_time = timestamp or datetime.now()
         
         for prediction in predictions:
             try:
@@ -89,7 +133,7 @@ class RoboflowDetector:
                 detection_data = {
                     "detection_id": prediction["detection_id"],
                     "timestamp": current_time,
-                    "model_id": self.model_id,
+                    "model_id": self.record_model_id,
                     "camera_id": self.camera_id,
                     "x": prediction["x"],
                     "y": prediction["y"],
@@ -115,20 +159,40 @@ class RoboflowDetector:
             except Exception as e:
                 logger.error(f"Error processing predictions: {e}\n{prediction}")
 
+    def _infer(self, frame) -> List[dict]:
+        """Run inference on a frame, or on its ROI crops / tiles if configured.
+
+        Returns:
+            Predictions in full-frame coordinates
+        """
+        # reconfigure() may swap these during the request; stick to one snapshot
+        plan, model_id = self.plan, self.model_id
+
+        if not plan.enabled:
+            prediction = self.client.infer(
+                inference_input=frame,
+                model_id=model_id
+            )
+            return prediction.get("predictions", [])
+
+        # Send all crops in one batched request
+        images, crops = plan.crops(frame)
+        results = self.client.infer(
+            inference_input=images,
+            model_id=model_id
+        )
+        if isinstance(results, dict):
+            results = [results]
+        return plan.merge([r.get("predictions", []) for r in results], crops)
+
     def _loop(self) -> None:
         """Main detection loop."""
         while self.running:
             frame = self.stream.get_latest_frame()
             if frame is not None:
                 try:
-                    # Run inference
-                    prediction = self.client.infer(
-                        inference_input=frame,
-                        model_id=self.model_id
-                    )
-
-                    # Check for predictions
-                    if predictions := prediction.get("predictions", []):
+                    # Run inference and check for predictions
+                    if predictions := self._infer(frame):
                         coro = self._process_predictions(predictions, frame)
                         asyncio.run_coroutine_threadsafe(coro, self.loop)
                                 
@@ -163,6 +227,9 @@ class RoboflowDetectorManager:
         confidence_threshold: float = 0.9,
         interval: float = 1.0,
         loop: asyncio.AbstractEventLoop = None,
+        rois: Optional[List[Sequence]] = None,
+        tile_size: int = 0,
+        tile_overlap: float = 0.2,
     ) -> None:
         """Add a detector for a stream.
         
@@ -171,6 +238,9 @@ class RoboflowDetectorManager:
             model_id: Roboflow model ID
             confidence_threshold: Minimum confidence for detections
             interval: Seconds between inference runs
+            rois: Rectangles / polygons to restrict inference to
+            tile_size: Split ROIs into square tiles of this size (0 disables tiling)
+            tile_overlap: Fraction of overlap between neighbouring tiles
         """
         camera_id = stream.camera_id
         
@@ -183,12 +253,19 @@ class RoboflowDetectorManager:
             model_id=model_id,
             confidence_threshold=confidence_threshold,
             interval=interval,
-            loop=loop
+            loop=loop,
+            rois=rois,
+            tile_size=tile_size,
+            tile_overlap=tile_overlap,
         )
         
         detector.start()
         self.detectors[camera_id] = detector
         
+    def get_detector(self, camera_id: str) -> Optional[RoboflowDetector]:
+        """Get a detector by camera ID."""
+        return self.detectors.get(camera_id)
+
     def stop_detector(self, camera_id: str) -> None:
         """Stop a specific detector."""
         if detector := self.detectors.get(camera_id):
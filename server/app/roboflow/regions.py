@@ -0,0 +1,220 @@
+"""
+Region-of-interest cropping and tiling for inference.
+
+This module provides:
+- InferencePlan: turns a frame into the crops that are actually sent for
+  inference (per-camera ROIs, optionally split into overlapping tiles) and
+  maps the resulting predictions back to full-frame coordinates, merging
+  duplicates across tiles with NMS
+
+ROIs are given per camera as rectangles ``[x1, y1, x2, y2]`` or polygons
+``[[x, y], [x, y], ...]`` in full-frame pixel coordinates.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Crop = Tuple[int, int, int, int]  # x0, y0, x1, y1
+
+
+def _is_rectangle(roi: Sequence) -> bool:
+    return len(roi) == 4 and all(isinstance(v, (int, float)) for v in roi)
+
+
+def tile_positions(start: int, stop: int, tile: int, step: int) -> List[int]:
+    """Start offsets of tiles covering [start, stop), the last one flush with ``stop``."""
+    if stop - start <= tile:
+        return [start]
+    positions = list(range(start, stop - tile, step))
+    positions.append(stop - tile)
+    return positions
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression.
+
+    Args:
+        boxes: (N, 4) array of x1, y1, x2, y2
+        scores: (N,) confidence scores
+        iou_threshold: Boxes overlapping a kept box by more than this are dropped
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(scores)[::-1]
+
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=int)
+
+
+class InferencePlan:
+    """Crops a frame to its ROIs / tiles and remaps predictions back."""
+
+    def __init__(
+        self,
+        rois: Optional[List[Sequence]] = None,
+        tile_size: int = 0,
+        tile_overlap: float = 0.2,
+        nms_iou: float = 0.5,
+    ):
+        """Initialize the plan.
+
+        Args:
+            rois: Rectangles or polygons to run inference on. None means the whole frame
+            tile_size: Split each ROI into square tiles of this size. 0 disables tiling
+            tile_overlap: Fraction of overlap between neighbouring tiles
+            nms_iou: IoU threshold for merging duplicate boxes across crops
+
+        Raises:
+            ValueError: If tile_size is negative or tile_overlap is outside [0, 1)
+        """
+        if tile_size < 0:
+            raise ValueError(f"tile_size must be >= 0, got {tile_size}")
+        if not 0 <= tile_overlap < 1:
+            raise ValueError(f"tile_overlap must be in [0, 1), got {tile_overlap}")
+
+        self.rois = rois or []
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.nms_iou = nms_iou
+
+        # Computed lazily for the first frame shape seen
+        self._shape: Optional[Tuple[int, int]] = None
+        self._crops: List[Crop] = []
+        self._mask: Optional[np.ndarray] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether this plan does anything beyond sending the whole frame."""
+        return bool(self.rois) or self.tile_size > 0
+
+    def _prepare(self, height: int, width: int) -> None:
+        """Compute crop rectangles and the ROI mask for a frame size."""
+        self._shape = (height, width)
+        regions: List[Crop] = []
+        mask = None
+
+        if not self.rois:
+            regions.append((0, 0, width, height))
+        else:
+            mask = np.zeros((height, width), np.uint8)
+            for roi in self.rois:
+                if _is_rectangle(roi):
+                    x1, y1, x2, y2 = (int(v) for v in roi)
+                    mask[max(y1, 0):y2, max(x1, 0):x2] = 1
+                    polygon = np.array([[x1, y1], [x2, y2]])
+                else:
+                    polygon = np.array(roi, np.int32)
+                    cv2.fillPoly(mask, [polygon], 1)
+                x0, y0 = np.clip(polygon.min(axis=0), 0, None)
+                x1, y1 = polygon.max(axis=0)
+                x1, y1 = min(x1, width), min(y1, height)
+                if x1 > x0 and y1 > y0:
+                    regions.append((int(x0), int(y0), int(x1), int(y1)))
+                else:
+                    logger.warning(f"ROI {roi} lies outside the {width}x{height} frame; ignoring it")
+            mask = mask.astype(bool)
+
+            if not regions:
+                # Only evaluated once per frame size, so this logs once
+                logger.warning(f"No ROI overlaps the {width}x{height} frame; using the full frame")
+                regions.append((0, 0, width, height))
+                mask = None
+
+        crops: List[Crop] = []
+        if self.tile_size > 0:
+            tile = self.tile_size
+            step = max(int(tile * (1 - self.tile_overlap)), 1)
+            for x0, y0, x1, y1 in regions:
+                for ty in tile_positions(y0, y1, tile, step):
+                    for tx in tile_positions(x0, x1, tile, step):
+                        crops.append((tx, ty, min(tx + tile, x1), min(ty + tile, y1)))
+        else:
+            crops = regions
+
+        self._crops = crops
+        self._mask = mask
+
+    def crops(self, frame: np.ndarray) -> Tuple[List[np.ndarray], List[Crop]]:
+        """Cut a frame into the images to send for inference.
+
+        Returns:
+            (crop images, crop rectangles in full-frame coordinates)
+        """
+        if self._shape != frame.shape[:2]:
+            self._prepare(*frame.shape[:2])
+
+        images = []
+        for x0, y0, x1, y1 in self._crops:
+            crop = frame[y0:y1, x0:x1]
+            if self._mask is not None:
+                # Blank out anything outside a polygon ROI
+                region_mask = self._mask[y0:y1, x0:x1]
+                if not region_mask.all():
+                    crop = crop.copy()
+                    crop[~region_mask] = 0
+            images.append(crop)
+        return images, self._crops
+
+    def merge(self, results: List[List[dict]], crops: List[Crop]) -> List[dict]:
+        """Map per-crop predictions to full-frame coordinates and merge duplicates.
+
+        Args:
+            results: Predictions for each crop, in crop coordinates
+            crops: The crop rectangles the results belong to
+
+        Returns:
+            Predictions in full-frame coordinates
+        """
+        flat = [p for preds in results for p in preds]
+        if not flat:
+            return []
+
+        offsets = np.array(
+            [crop[:2] for crop, preds in zip(crops, results) for _ in preds], np.float64
+        )
+        boxes = np.array([[p["x"], p["y"], p["width"], p["height"]] for p in flat], np.float64)
+        scores = np.array([p["confidence"] for p in flat], np.float64)
+        class_ids = np.array([p.get("class_id", 0) for p in flat])
+
+        centers = boxes[:, :2] + offsets
+        keep = np.ones(len(flat), bool)
+
+        # Drop boxes centred outside the ROIs (tile corners can stick out of a polygon)
+        if self._mask is not None:
+            height, width = self._mask.shape
+            cx = np.clip(centers[:, 0].astype(int), 0, width - 1)
+            cy = np.clip(centers[:, 1].astype(int), 0, height - 1)
+            keep &= self._mask[cy, cx]
+
+        # Cross-crop NMS, per class
+        if len(crops) > 1:
+            half = boxes[:, 2:] / 2
+            corners = np.hstack([centers - half, centers + half])
+            merged = np.zeros(len(flat), bool)
+            for class_id in np.unique(class_ids[keep]):
+                idx = np.flatnonzero(keep & (class_ids == class_id))
+                merged[idx[nms(corners[idx], scores[idx], self.nms_iou)]] = True
+            keep = merged
+
+        return [
+            {**flat[i], "x": float(centers[i, 0]), "y": float(centers[i, 1])}
+            for i in np.flatnonzero(keep)
+        ]
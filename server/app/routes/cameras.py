@@ -0,0 +1,63 @@
+# app/routes/cameras.py
+from fastapi import APIRouter, HTTPException
+
+from app.cameras import CameraRegistry, load_camera_configs
+from app.models import CameraConfig
+from app.rtsp.stream import RTSPStreamManager
+
+router = APIRouter(prefix="", tags=["Cameras"])
+
+
+# ───────── endpoints ───────────────────────────────────────────────────────
+@router.get("/cameras")
+def list_cameras():
+    """List configured cameras with stream state and per-camera memory use."""
+    configs = dict(CameraRegistry().configs)
+    manager = RTSPStreamManager()
+    streams = dict(manager.streams)
+    memory = manager.memory_report()
+    return {
+        "cameras": [
+            {
+                "camera_id": camera_id,
+                "config": configs[camera_id].model_dump(exclude_none=True) if camera_id in configs else None,
+                "running": camera_id in streams and streams[camera_id].running,
+                "memory": memory.get(camera_id),
+            }
+            for camera_id in sorted(configs.keys() | streams.keys())
+        ],
+        "total_bytes": sum(m["total_bytes"] for m in memory.values()),
+    }
+
+
+@router.put("/cameras/{camera_id}")
+def upsert_camera(camera_id: str, config: CameraConfig):
+    """Add a camera or update one in place; other cameras keep running.
+
+    Invalid ROI / tiling fields are rejected with a 422 by the model.
+    """
+    if config.name != camera_id:
+        raise HTTPException(status_code=400, detail="Camera name must match the URL")
+    try:
+        action = CameraRegistry().upsert(config)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start camera: {e}")
+    return {"camera_id": camera_id, "action": action or "unchanged"}
+
+
+@router.delete("/cameras/{camera_id}")
+def remove_camera(camera_id: str):
+    """Stop and remove a single camera."""
+    if not CameraRegistry().remove(camera_id):
+        raise HTTPException(status_code=404, detail="Camera not found")
+    return {"camera_id": camera_id, "action": "removed"}
+
+
+@router.post("/cameras/reload")
+def reload_cameras():
+    """Re-read the camera config and apply only what changed."""
+    try:
+        configs = load_camera_configs()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CameraRegistry().apply(configs)
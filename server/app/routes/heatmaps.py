@@ -0,0 +1,58 @@
+# app/routes/heatmaps.py
+from typing import Literal, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+
+from app.analytics.heatmaps import HeatmapService, encode_rle
+
+router = APIRouter(prefix="/heatmaps", tags=["Heatmaps"])
+
+
+def _respond(heatmap: np.ndarray, format: str):
+    """Return a heatmap as run-length encoded JSON or raw float32 bytes."""
+    if format == "binary":
+        return Response(
+            content=heatmap.astype("<f4").tobytes(),
+            media_type="application/octet-stream",
+            headers={
+                "X-Heatmap-Shape": ",".join(map(str, heatmap.shape)),
+                "X-Heatmap-Dtype": "float32",
+            },
+        )
+    return encode_rle(heatmap)
+
+
+# ───────── endpoints ───────────────────────────────────────────────────────
+@router.get("/cameras/{camera_id}")
+def camera_heatmap(
+    camera_id: str,
+    days: int = Query(default=7, ge=1, le=365),
+    model_id: Optional[str] = None,
+    class_name: Optional[str] = None,
+    format: Literal["rle", "binary"] = "rle",
+):
+    """Where pets spend time in a camera's frame (pixel space)."""
+    heatmap = HeatmapService().camera_heatmap(
+        camera_id, days=days, model_id=model_id, class_name=class_name
+    )
+    return _respond(heatmap, format)
+
+
+@router.get("/floorplan")
+def floorplan_heatmap(
+    room: Optional[str] = None,
+    days: int = Query(default=7, ge=1, le=365),
+    model_id: Optional[str] = None,
+    class_name: Optional[str] = None,
+    format: Literal["rle", "binary"] = "rle",
+):
+    """Where pets spend time on the floorplan, optionally for a single room."""
+    try:
+        heatmap = HeatmapService().floorplan_heatmap(
+            room=room, days=days, model_id=model_id, class_name=class_name
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _respond(heatmap, format)
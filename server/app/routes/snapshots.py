@@ -0,0 +1,48 @@
+# app/routes/snapshots.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+
+from app.storage.derivatives import ALLOWED_WIDTHS, DerivativeCache
+
+router = APIRouter(prefix="", tags=["Snapshots"])
+
+# Snapshots (and therefore their derivatives) never change once written
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+# ───────── endpoints ───────────────────────────────────────────────────────
+@router.get("/snapshots/{filename}")
+def get_snapshot(
+    filename: str,
+    request: Request,
+    width: Optional[int] = Query(default=None, gt=0),
+    format: Literal["jpeg", "webp"] = "jpeg",
+):
+    """Serve a snapshot, optionally as a cached downscaled / WebP derivative."""
+    cache = DerivativeCache()
+    source = cache.source_path(filename)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+    original = width is None and format == "jpeg"
+    if not original and width is None:
+        # Format change only: never upscaled past the source size
+        width = ALLOWED_WIDTHS[-1]
+    etag = cache.etag(source) if original else cache.etag(source, width, format)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    if original:
+        path = source
+    else:
+        try:
+            path, _ = cache.get(source, width, format)
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return FileResponse(path, media_type=MEDIA_TYPES[format], headers=headers)
@@ -12,7 +12,7 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="", tags=["RTP"])
 
-from app.utils.signals import high_confidence_detection_made, detection_made, snapshot_made
+from app.utils.signals import high_confidence_detection_made, detection_made, snapshot_made, clip_made
 _clients: Set[WebSocket] = set()
 
 async def get_initial_data():
@@ -134,4 +134,17 @@ async def publish_snapshot(sender, frame, **kw):
                   "data": {"asset_path": kw["asset_path"]}
               })
         except Exception as e:
-            logger.error(f"{type(e)} error sending snapshot to client: {e}")
\ No newline at end of file
+            logger.error(f"{type(e)} error sending snapshot to client: {e}")
+
+@clip_made.connect
+async def publish_clip(sender, **kw):
+    for websocket in list(_clients):
+        try:
+          await websocket.send_json({
+                  "timestamp": datetime.now().isoformat(),
+                  "status": "active",
+                  "message": "clip_made",
+                  "data": {"asset_path": kw["asset_path"], "camera_id": kw.get("camera_id")}
+              })
+        except Exception as e:
+            logger.error(f"{type(e)} error sending clip to client: {e}")
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Bounded pre-roll buffer of compressed frames.
+
+This module provides:
+- PrerollBuffer: keeps the last N seconds of JPEG-encoded frames for a
+  camera, capped by both a time window and a byte budget
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class PrerollBuffer:
+    """Thread-safe ring buffer of (timestamp, jpeg bytes) pairs."""
+
+    def __init__(
+        self,
+        seconds: float = 10.0,
+        fps: float = 5.0,
+        quality: int = 50,
+        max_bytes: int = 4 * 1024 * 1024,
+    ):
+        """Initialize the buffer.
+
+        Args:
+            seconds: Length of the pre-roll window to keep
+            fps: Maximum rate at which frames are encoded into the buffer
+            quality: JPEG quality used for buffered frames
+            max_bytes: Hard cap on the total size of buffered frames
+        """
+        self.seconds = seconds
+        self.fps = fps
+        self.quality = quality
+        self.max_bytes = max_bytes
+
+        self._frames: Deque[Tuple[float, bytes]] = deque()
+        self._bytes = 0
+        self._last_ts: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def wants(self, ts: float) -> bool:
+        """Whether a frame at ``ts`` should be encoded, given the sample rate."""
+        return self._last_ts is None or ts - self._last_ts >= 1.0 / self.fps
+
+    def add(self, ts: float, frame: np.ndarray) -> None:
+        """Encode a frame and append it, evicting old frames to stay in budget."""
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        data = encoded.tobytes()
+
+        with self._lock:
+            self._last_ts = ts
+            self._frames.append((ts, data))
+            self._bytes += len(data)
+
+            horizon = ts - self.seconds
+            while self._frames and (
+                self._frames[0][0] < horizon or self._bytes > self.max_bytes
+            ):
+                _, old = self._frames.popleft()
+                self._bytes -= len(old)
+
+    def frames_between(self, start: float, end: float) -> List[Tuple[float, bytes]]:
+        """Return buffered frames with ``start <= ts <= end``, oldest first."""
+        with self._lock:
+            return [(ts, data) for ts, data in self._frames if start <= ts <= end]
+
+    def clear(self) -> None:
+        """Drop all buffered frames."""
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+            self._last_ts = None
+
+    def stats(self) -> dict:
+        """Report buffer occupancy and memory use."""
+        with self._lock:
+            span = self._frames[-1][0] - self._frames[0][0] if self._frames else 0.0
+            return {
+                "frames": len(self._frames),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "seconds": round(span, 2),
+            }
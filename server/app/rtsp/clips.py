@@ -0,0 +1,185 @@
+"""Event clip assembly from pre-roll buffers.
+
+This module provides:
+- ClipWriter: background worker (singleton) that waits for the post-roll to
+  elapse, cuts pre-roll + post-roll frames out of a stream's buffer and
+  encodes them to an MP4 clip with FFmpeg
+"""
+
+from __future__ import annotations
+
+import asyncio, os, queue, subprocess, threading, time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.rtsp.stream import RTSPStream
+from app.utils.logger import get_logger
+from app.utils.signals import clip_made
+
+logger = get_logger(__name__)
+
+CLIP_SUBDIR = "clips"
+
+
+@dataclass
+class ClipRequest:
+    """A pending clip for a single high-confidence detection."""
+
+    stream: RTSPStream
+    event_ts: float
+    filename: str
+    sender: object
+    loop: Optional[asyncio.AbstractEventLoop]
+    metadata: dict
+    preroll: List[Tuple[float, bytes]]  # copied at request time so queueing delays can't evict it
+
+
+class ClipWriter:
+    """Singleton background worker that assembles event clips."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.queue: "queue.Queue[ClipRequest]" = queue.Queue(maxsize=32)
+        # camera_id -> end of the most recent clip window, to avoid
+        # overlapping clips for back-to-back detections
+        self._covered_until: Dict[str, float] = {}
+        # Guards RTSPStream.pending_clip_bytes (at most one pending clip per camera)
+        self._pending_lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self._initialized = True
+
+    def _ensure_worker(self) -> None:
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+
+    def request(
+        self,
+        stream: RTSPStream,
+        event_ts: float,
+        filename: str,
+        sender: object = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        **metadata,
+    ) -> bool:
+        """Queue a clip around ``event_ts`` for ``stream``.
+
+        Args:
+            stream: Stream whose pre-roll buffer the clip is cut from
+            event_ts: Epoch seconds of the triggering detection
+            filename: Output file name (inside the clips directory)
+            sender: Sender passed along with the ``clip_made`` signal
+            loop: Event loop used to emit ``clip_made``
+            **metadata: Extra keyword arguments forwarded with the signal
+
+        Returns:
+            True if the clip was queued, False if skipped (the event is
+            already covered by a clip, or this camera's clip is still pending)
+        """
+        if stream.preroll is None:
+            return False
+
+        camera_id = stream.camera_id
+        if event_ts <= self._covered_until.get(camera_id, 0.0):
+            return False
+
+        with self._pending_lock:
+            # Bound the pre-roll copies held outside the buffer to one per camera
+            if stream.pending_clip_bytes is not None:
+                return False
+
+            preroll = stream.preroll.frames_between(event_ts - stream.PREROLL_SECONDS, event_ts)
+            try:
+                self.queue.put_nowait(
+                    ClipRequest(stream, event_ts, filename, sender, loop, metadata, preroll)
+                )
+            except queue.Full:
+                logger.warning(f"[{camera_id}] clip queue full, dropping clip request")
+                return False
+            stream.pending_clip_bytes = sum(len(data) for _, data in preroll)
+
+        # The next clip's pre-roll reaches back PREROLL_SECONDS, so only
+        # events after this whole window start a new, non-overlapping clip
+        self._covered_until[camera_id] = (
+            event_ts + stream.PREROLL_SECONDS + stream.POSTROLL_SECONDS
+        )
+        self._ensure_worker()
+        return True
+
+    def _loop(self) -> None:
+        """Worker loop that waits out the post-roll and writes clips."""
+        while True:
+            req = self.queue.get()
+            try:
+                wait = req.event_ts + req.stream.POSTROLL_SECONDS - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+                self._write_clip(req)
+            except Exception as e:
+                logger.error(f"Error writing clip {req.filename}: {e}")
+            finally:
+                with self._pending_lock:
+                    req.stream.pending_clip_bytes = None
+                self.queue.task_done()
+
+    def _write_clip(self, req: ClipRequest) -> None:
+        """Encode the buffered frames for ``req`` into an MP4 file."""
+        stream = req.stream
+        postroll = [
+            (ts, data)
+            for ts, data in stream.preroll.frames_between(
+                req.event_ts, req.event_ts + stream.POSTROLL_SECONDS
+            )
+            if ts > req.event_ts
+        ]
+        frames = req.preroll + postroll
+        if len(frames) < 2:
+            logger.warning(f"[{stream.camera_id}] not enough buffered frames for clip")
+            return
+
+        snapshot_dir = os.getenv("SNAPSHOT_DIR", "app/snapshots")
+        clip_dir = os.path.join(snapshot_dir, CLIP_SUBDIR)
+        os.makedirs(clip_dir, exist_ok=True)
+        filepath = os.path.join(clip_dir, req.filename)
+
+        # Buffered frames are already JPEG, so feed them straight to FFmpeg
+        fps = (len(frames) - 1) / max(frames[-1][0] - frames[0][0], 1e-3)
+        cmd = [
+            "ffmpeg", "-y",
+            "-f", "image2pipe",
+            "-framerate", f"{fps:.3f}",
+            "-c:v", "mjpeg",
+            "-i", "-",
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-pix_fmt", "yuv420p",
+            "-movflags", "+faststart",
+            "-loglevel", "error",
+            filepath,
+        ]
+        result = subprocess.run(
+            cmd,
+            input=b"".join(data for _, data in frames),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        if result.returncode != 0:
+            logger.error(f"[{stream.camera_id}] ffmpeg clip encode failed: {result.stderr.decode(errors='ignore')}")
+            return
+
+        asset_path = f"{CLIP_SUBDIR}/{req.filename}"
+        logger.info(f"[{stream.camera_id}] saved clip {asset_path} ({len(frames)} frames)")
+
+        if req.loop is not None:
+            coro = clip_made.send_async(req.sender, asset_path=asset_path, **req.metadata)
+            asyncio.run_coroutine_threadsafe(coro, req.loop)
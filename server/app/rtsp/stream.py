@@ -3,14 +3,18 @@
 
 This module provides:
 - RTSPStream: pulls frames via FFmpeg subprocess (no cv2.VideoCapture)
+  and keeps a bounded pre-roll buffer of compressed frames for clips
+- FileStream: decodes a recorded video file frame by frame for replay
 - RTSPStreamManager: manages multiple streams (singleton)
 """
 
 from __future__ import annotations
 
 import subprocess, threading, time, numpy as np, os
-from typing import Dict, Optional
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
 
+from app.rtsp.buffer import PrerollBuffer
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,6 +27,13 @@ class RTSPStream:
     HEIGHT: int = int(os.getenv("FRAME_HEIGHT", 480))
     PIXELS: int = WIDTH * HEIGHT * 3  # 3 channels (bgr24)
 
+    # Pre-roll buffer (compressed frames kept for event clips)
+    PREROLL_SECONDS: float = float(os.getenv("PREROLL_SECONDS", 5))
+    POSTROLL_SECONDS: float = float(os.getenv("POSTROLL_SECONDS", 3))
+    PREROLL_FPS: float = float(os.getenv("PREROLL_FPS", 5))
+    PREROLL_QUALITY: int = int(os.getenv("PREROLL_QUALITY", 50))
+    PREROLL_MAX_BYTES: int = int(float(os.getenv("PREROLL_MAX_MB", 4)) * 1024 * 1024)
+
     def __init__(self, camera_id: str, rtsp_url: str):
         self.camera_id = camera_id
         self.rtsp_url = rtsp_url
@@ -31,6 +42,20 @@ class RTSPStream:
         self.lock = threading.Lock()
         self.running = False
 
+        # Window covers pre-roll plus post-roll so a clip can be cut once
+        # the post-roll has elapsed
+        # Bytes of pre-roll copied out for a queued clip, None if no clip is pending
+        # (see ClipWriter)
+        self.pending_clip_bytes: Optional[int] = None
+        self.preroll: Optional[PrerollBuffer] = None
+        if self.PREROLL_SECONDS > 0:
+            self.preroll = PrerollBuffer(
+                seconds=self.PREROLL_SECONDS + self.POSTROLL_SECONDS,
+                fps=self.PREROLL_FPS,
+                quality=self.PREROLL_QUALITY,
+                max_bytes=self.PREROLL_MAX_BYTES,
+            )
+
     def start(self) -> None:
         """Launch FFmpeg and start the reader thread."""
         self.running = True
@@ -47,6 +72,21 @@ class RTSPStream:
         self.running = False
         if self.pipe and self.pipe.poll() is None:
             self.pipe.terminate()
+        if self.preroll:
+            self.preroll.clear()
+
+    def memory_stats(self) -> dict:
+        """Report memory held by this stream (latest frame, pre-roll buffer, pending clip)."""
+        with self.lock:
+            latest_bytes = 0 if self.latest is None else self.latest.nbytes
+        preroll = self.preroll.stats() if self.preroll else None
+        pending = self.pending_clip_bytes or 0
+        return {
+            "latest_frame_bytes": latest_bytes,
+            "preroll": preroll,
+            "pending_clip_bytes": pending,
+            "total_bytes": latest_bytes + (preroll["bytes"] if preroll else 0) + pending,
+        }
 
     def _ffmpeg_cmd(self):
         """
@@ -93,13 +133,99 @@ class RTSPStream:
             with self.lock:
                 self.latest = frame
 
+            if self.preroll:
+                ts = time.time()
+                if self.preroll.wants(ts):
+                    self.preroll.add(ts, frame)
+
             frame_count += 1
             if frame_count % 60 == 0:
-                logger.info(f"[{self.camera_id}] {frame_count} frames decoded")
+                logger.info(
+                    "[%s] %d frames decoded", self.camera_id, frame_count,
+                    extra={"event": "stream.frames", "camera_id": self.camera_id},
+                )
 
         logger.info(f"[{self.camera_id}] reader stopped")
 
 
+class FileStream(RTSPStream):
+    """Decodes a recorded video file as fast as FFmpeg allows.
+
+    Frames are sampled every ``interval`` seconds of video time. Iterate
+    ``frames()`` to get every sampled frame in order with simulated capture
+    timestamps; ``start()`` still works like RTSPStream and publishes the
+    latest frame from a reader thread.
+    """
+
+    def __init__(self, camera_id: str, path: str, start_time: datetime, interval: float = 1.0):
+        super().__init__(camera_id, path)
+        self.start_time = start_time
+        self.interval = interval
+        self.preroll = None  # clips aren't cut during replay
+        self.error: Optional[str] = None
+
+    def _ffmpeg_cmd(self):
+        """
+        Output raw BGR frames sampled at 1/interval fps of video time.
+        -vf fps,scale            → sample + resize
+        -pix_fmt bgr24           → OpenCV-friendly pixel format
+        """
+        return [
+            "ffmpeg",
+            "-i", self.rtsp_url,
+            "-vf", f"fps=1/{self.interval},scale={self.WIDTH}:{self.HEIGHT}",
+            "-pix_fmt", "bgr24",
+            "-f", "rawvideo",
+            "-loglevel", "error",
+            "-"                       # stdout
+        ]
+
+    def frames(self) -> Iterator[Tuple[datetime, np.ndarray]]:
+        """Yield (simulated timestamp, frame) pairs until the file ends.
+
+        If FFmpeg is missing or exits with an error (missing / unreadable
+        file), it is logged and kept in ``self.error``.
+        """
+        self.running = True
+        self.error = None
+        try:
+            self.pipe = subprocess.Popen(
+                self._ffmpeg_cmd(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=10**8
+            )
+        except FileNotFoundError:
+            self.error = "ffmpeg not installed inside the image!"
+            logger.error(f"[{self.camera_id}] {self.rtsp_url}: {self.error}")
+            self.stop()
+            return
+
+        frame_bytes = self.PIXELS
+        index = 0
+        reached_end = False
+        try:
+            while self.running:
+                raw = self.pipe.stdout.read(frame_bytes)
+                if len(raw) != frame_bytes:
+                    reached_end = self.running  # not a stop() terminating FFmpeg
+                    break
+
+                frame = np.frombuffer(raw, np.uint8).reshape((self.HEIGHT, self.WIDTH, 3))
+                with self.lock:
+                    self.latest = frame
+
+                yield self.start_time + timedelta(seconds=index * self.interval), frame
+                index += 1
+        finally:
+            # Only check the exit status if FFmpeg finished on its own
+            if reached_end and self.pipe.wait() != 0:
+                stderr = self.pipe.stderr.read().decode(errors="ignore").strip()
+                self.error = f"ffmpeg exited with {self.pipe.returncode}: {stderr}"
+                logger.error(f"[{self.camera_id}] {self.rtsp_url}: {self.error}")
+            self.stop()
+
+
 class RTSPStreamManager:
     """Singleton manager for multiple RTSP streams."""
     
@@ -153,6 +279,10 @@ class RTSPStreamManager:
             stream.stop()
             del self.streams[camera_id]
 
+    def memory_report(self) -> Dict[str, dict]:
+        """Report per-camera memory use for all streams."""
+        return {camera_id: stream.memory_stats() for camera_id, stream in list(self.streams.items())}
+
     def stop_all(self) -> None:
         """Stop all streams."""
         for camera_id in list(self.streams.keys()):
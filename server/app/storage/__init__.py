@@ -0,0 +1,19 @@
+"""
+Storage package for detection data and snapshot assets.
+
+This package provides:
+- Daily partition management for the detection table
+- Snapshot retention (age and size budget)
+- A background retention job tying the two together
+"""
+
+from app.storage.partitions import ensure_partitions, drop_expired_partitions
+from app.storage.snapshots import prune_snapshots
+from app.storage.retention import RetentionJob
+
+__all__ = [
+    "ensure_partitions",
+    "drop_expired_partitions",
+    "prune_snapshots",
+    "RetentionJob",
+]
@@ -0,0 +1,165 @@
+"""
+On-disk cache of downscaled snapshot derivatives.
+
+Snapshots are immutable once written, so a derivative (a given width and
+format of a given snapshot) never needs to be regenerated. Derivatives are
+created on first request (or warmed when a snapshot is written) and kept on
+disk under an LRU size cap.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Widths are snapped to this set so clients can't fill the cache with
+# arbitrary sizes
+ALLOWED_WIDTHS = (160, 320, 640, 1280)
+FORMATS = {
+    "jpeg": (".jpg", [cv2.IMWRITE_JPEG_QUALITY, 80]),
+    "webp": (".webp", [cv2.IMWRITE_WEBP_QUALITY, 75]),
+}
+
+
+def snap_width(width: int) -> int:
+    """Round a requested width up to the nearest allowed width."""
+    for allowed in ALLOWED_WIDTHS:
+        if width <= allowed:
+            return allowed
+    return ALLOWED_WIDTHS[-1]
+
+
+class DerivativeCache:
+    """Singleton LRU cache of snapshot thumbnails on disk."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self.snapshot_dir = os.getenv("SNAPSHOT_DIR", "app/snapshots")
+        self.cache_dir = os.getenv(
+            "DERIVATIVE_CACHE_DIR", os.path.join(self.snapshot_dir, ".derivatives")
+        )
+        self.max_bytes = int(float(os.getenv("DERIVATIVE_CACHE_MAX_MB", 256)) * 1024 * 1024)
+
+        # name -> size in bytes, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load()
+        self._initialized = True
+
+    def _load(self) -> None:
+        """Index derivatives already on disk, oldest access first."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entries = sorted(
+            (entry.stat().st_mtime, entry.name, entry.stat().st_size)
+            for entry in os.scandir(self.cache_dir)
+            if entry.is_file()
+        )
+        for _, name, size in entries:
+            self._entries[name] = size
+            self._bytes += size
+
+    def source_path(self, filename: str) -> Optional[str]:
+        """Resolve a snapshot filename to its path, rejecting anything outside the snapshot dir."""
+        if os.path.basename(filename) != filename or not filename.endswith(".jpg"):
+            return None
+        path = os.path.join(self.snapshot_dir, filename)
+        return path if os.path.isfile(path) else None
+
+    @staticmethod
+    def digest(source_path: str, width: Optional[int], fmt: str) -> str:
+        """Content key for a derivative, derived from the source file identity."""
+        stat = os.stat(source_path)
+        key = f"{os.path.basename(source_path)}:{stat.st_size}:{stat.st_mtime_ns}:{width}:{fmt}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    @classmethod
+    def etag(cls, source_path: str, width: Optional[int] = None, fmt: str = "jpeg") -> str:
+        """Strong ETag for a snapshot (``width=None``) or one of its derivatives."""
+        if width is not None:
+            width = snap_width(width)
+        return f'"{cls.digest(source_path, width, fmt)}"'
+
+    def get(self, source_path: str, width: int, fmt: str = "jpeg") -> Tuple[str, str]:
+        """Return the path and ETag of a derivative, generating it if needed.
+
+        Args:
+            source_path: Path of the original snapshot
+            width: Requested width (snapped to ``ALLOWED_WIDTHS``)
+            fmt: Output format, one of ``FORMATS``
+
+        Returns:
+            (path to the derivative file, strong ETag)
+        """
+        width = snap_width(width)
+        ext, params = FORMATS[fmt]
+        digest = self.digest(source_path, width, fmt)
+        tag = f'"{digest}"'
+        name = f"{digest}{ext}"
+        path = os.path.join(self.cache_dir, name)
+
+        with self._lock:
+            if name in self._entries and os.path.exists(path):
+                self._entries.move_to_end(name)
+                os.utime(path)
+                return path, tag
+
+        image = cv2.imread(source_path)
+        if image is None:
+            raise ValueError(f"Unable to read snapshot {source_path}")
+
+        height, src_width = image.shape[:2]
+        if src_width > width:
+            image = cv2.resize(
+                image, (width, round(height * width / src_width)), interpolation=cv2.INTER_AREA
+            )
+
+        ok, encoded = cv2.imencode(ext, image, params)
+        if not ok:
+            raise ValueError(f"Unable to encode {fmt} derivative of {source_path}")
+
+        # Write atomically so concurrent readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encoded.tobytes())
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._bytes -= self._entries.pop(name, 0)
+            self._entries[name] = encoded.nbytes
+            self._bytes += encoded.nbytes
+            self._evict()
+
+        return path, tag
+
+    def _evict(self) -> None:
+        """Remove least recently used derivatives until under the size cap."""
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError as e:
+                logger.error(f"Error evicting derivative {name}: {e}")
+
+    def stats(self) -> dict:
+        """Report cache occupancy."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
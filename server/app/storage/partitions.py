@@ -0,0 +1,227 @@
+"""
+Daily range partitions for the detection table.
+
+Partitions are named ``detection_pYYYYMMDD`` and cover one calendar day of
+``Detection.timestamp``. They are created ahead of time by the app so inserts
+never hit a missing partition, and expired ones are detached and dropped (or
+moved to an archive schema) instead of running large DELETEs.
+"""
+
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PARENT_TABLE = "detection"
+PARTITION_PREFIX = f"{PARENT_TABLE}_p"
+ARCHIVE_SCHEMA = "detection_archive"
+LEGACY_TABLE = f"{PARENT_TABLE}_legacy"
+
+Bind = Union[Engine, Connection]
+
+
+@contextmanager
+def _transaction(bind: Bind) -> Iterator[Connection]:
+    """Use an existing connection as-is, or open a transaction on an engine."""
+    if isinstance(bind, Connection):
+        yield bind
+    else:
+        with bind.begin() as conn:
+            yield conn
+
+
+def partition_name(day: date) -> str:
+    """Return the partition table name for a given day."""
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _partition_day(name: str) -> Optional[date]:
+    """Parse the day out of a partition name (None if it isn't one of ours)."""
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def table_kind(bind: Bind) -> Optional[str]:
+    """pg_class.relkind of the detection table: 'p' partitioned, 'r' plain, None missing."""
+    with _transaction(bind) as conn:
+        return conn.execute(
+            text("SELECT relkind FROM pg_class WHERE relname = :name"),
+            {"name": PARENT_TABLE},
+        ).scalar()
+
+
+def is_partitioned(bind: Bind) -> bool:
+    """Check whether the detection table is a partitioned table."""
+    return table_kind(bind) == "p"
+
+
+def list_partitions(bind: Bind) -> List[str]:
+    """List the partitions currently attached to the detection table."""
+    with _transaction(bind) as conn:
+        rows = conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON i.inhrelid = c.oid "
+                "JOIN pg_class p ON i.inhparent = p.oid "
+                "WHERE p.relname = :name"
+            ),
+            {"name": PARENT_TABLE},
+        )
+        return sorted(row[0] for row in rows)
+
+
+def ensure_partitions(
+    bind: Bind,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    days_ahead: int = 3,
+) -> List[str]:
+    """Create any missing daily partitions covering ``start`` through ``end``.
+
+    Args:
+        bind: SQLAlchemy engine (or connection in an open transaction) to run DDL on
+        start: First day to cover. Defaults to yesterday
+        end: Last day to cover (inclusive). Defaults to today + days_ahead
+        days_ahead: Days ahead of today to pre-create when ``end`` is None
+
+    Returns:
+        Names of the partitions that were created
+    """
+    today = date.today()
+    start = start or today - timedelta(days=1)
+    end = end or today + timedelta(days=days_ahead)
+
+    existing = set(list_partitions(bind))
+    created = []
+
+    with _transaction(bind) as conn:
+        day = start
+        while day <= end:
+            name = partition_name(day)
+            if name not in existing:
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{day.isoformat()}') "
+                    f"TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+                created.append(name)
+            day += timedelta(days=1)
+
+    if created:
+        logger.info(f"Created detection partitions: {', '.join(created)}")
+    return created
+
+
+def drop_expired_partitions(
+    engine: Engine,
+    retention_days: int,
+    archive: bool = False,
+) -> List[str]:
+    """Detach partitions older than the retention window.
+
+    Detached partitions are dropped, or moved to the ``detection_archive``
+    schema when ``archive`` is set. Either way this is a metadata-only
+    operation regardless of how many rows the partition holds.
+
+    Args:
+        engine: SQLAlchemy engine to run DDL on
+        retention_days: Number of days of detections to keep (including today)
+        archive: Keep expired partitions in the archive schema instead of dropping
+
+    Returns:
+        Names of the partitions that were removed
+
+    Raises:
+        ValueError: If retention_days is less than 1 (that would drop today's partition)
+    """
+    if retention_days < 1:
+        raise ValueError(f"retention_days must be at least 1, got {retention_days}")
+
+    cutoff = date.today() - timedelta(days=retention_days - 1)
+    expired = [
+        name for name in list_partitions(engine)
+        if (day := _partition_day(name)) is not None and day < cutoff
+    ]
+    if not expired:
+        return []
+
+    with engine.begin() as conn:
+        if archive:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        for name in expired:
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            if archive:
+                conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            else:
+                conn.execute(text(f"DROP TABLE {name}"))
+
+    action = "Archived" if archive else "Dropped"
+    logger.info(f"{action} expired detection partitions: {', '.join(expired)}")
+    return expired
+
+
+def migrate_to_partitioned(engine: Engine, metadata) -> int:
+    """Convert a pre-existing plain detection table into the partitioned layout.
+
+    In a single transaction: the old table (with its primary key and id
+    sequence) is renamed out of the way, the partitioned table and partitions
+    covering every stored day are created, all rows are copied over with their
+    ids, the id sequence is advanced and the old table is dropped once the row
+    counts match.
+
+    Args:
+        engine: SQLAlchemy engine to run the migration on
+        metadata: SQLModel metadata used to create the partitioned table
+
+    Returns:
+        Number of rows migrated
+    """
+    logger.info(f"Migrating {PARENT_TABLE} to daily partitions")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+        conn.execute(text(
+            f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT {PARENT_TABLE}_pkey TO {LEGACY_TABLE}_pkey"
+        ))
+        conn.execute(text(
+            f"ALTER SEQUENCE IF EXISTS {PARENT_TABLE}_id_seq RENAME TO {LEGACY_TABLE}_id_seq"
+        ))
+        conn.execute(text(
+            f"ALTER INDEX IF EXISTS ix_{PARENT_TABLE}_timestamp RENAME TO ix_{LEGACY_TABLE}_timestamp"
+        ))
+
+        metadata.create_all(conn, tables=[metadata.tables[PARENT_TABLE]])
+
+        first, last, count = conn.execute(text(
+            f"SELECT min(timestamp), max(timestamp), count(*) FROM {LEGACY_TABLE}"
+        )).one()
+        if count:
+            ensure_partitions(conn, start=first.date(), end=max(last.date(), date.today()))
+        else:
+            ensure_partitions(conn)
+
+        columns = ", ".join(c.name for c in metadata.tables[PARENT_TABLE].columns)
+        copied = conn.execute(text(
+            f"INSERT INTO {PARENT_TABLE} ({columns}) SELECT {columns} FROM {LEGACY_TABLE}"
+        )).rowcount
+        if copied != count:
+            raise RuntimeError(f"copied {copied} of {count} detections; migration rolled back")
+
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{PARENT_TABLE}', 'id'), "
+            f"coalesce((SELECT max(id) FROM {PARENT_TABLE}), 0) + 1, false)"
+        ))
+        conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+
+    logger.info(f"Migrated {count} detections to daily partitions")
+    return count
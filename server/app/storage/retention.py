@@ -0,0 +1,115 @@
+"""
+Background retention job for detections and snapshots.
+
+This module provides:
+- RetentionJob: periodically pre-creates upcoming detection partitions,
+  drops (or archives) expired ones and prunes the snapshot and clip directories
+"""
+
+import os
+import threading
+from typing import Optional
+
+from app.db import engine
+from app.storage.partitions import (
+    drop_expired_partitions,
+    ensure_partitions,
+    is_partitioned,
+)
+from app.rtsp.clips import CLIP_SUBDIR
+from app.storage.snapshots import prune_snapshots
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RetentionJob:
+    """Runs partition maintenance and snapshot pruning on a fixed interval."""
+
+    def __init__(
+        self,
+        snapshot_dir: str,
+        detection_retention_days: Optional[int] = 30,
+        partition_days_ahead: int = 3,
+        archive_partitions: bool = False,
+        snapshot_max_age_days: Optional[float] = 14,
+        snapshot_max_bytes: Optional[int] = None,
+        clip_max_bytes: Optional[int] = None,
+        interval: float = 3600.0,
+    ):
+        """Initialize the job.
+
+        Args:
+            snapshot_dir: Directory holding snapshot JPEGs
+            detection_retention_days: Days of detections to keep. None keeps everything
+            partition_days_ahead: Days of partitions to create ahead of today
+            archive_partitions: Move expired partitions to the archive schema instead of dropping
+            snapshot_max_age_days: Delete snapshots older than this. None disables
+            snapshot_max_bytes: Total size budget for snapshots. None disables
+            clip_max_bytes: Total size budget for event clips. None disables
+            interval: Seconds between retention runs
+        """
+        self.snapshot_dir = snapshot_dir
+        self.detection_retention_days = detection_retention_days
+        self.partition_days_ahead = partition_days_ahead
+        self.archive_partitions = archive_partitions
+        self.snapshot_max_age_days = snapshot_max_age_days
+        self.snapshot_max_bytes = snapshot_max_bytes
+        self.clip_max_bytes = clip_max_bytes
+        self.interval = interval
+
+        self._stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the retention thread."""
+        if self.thread and self.thread.is_alive():
+            logger.warning("Retention job already running")
+            return
+
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        logger.info(f"Retention job started (every {self.interval:.0f}s)")
+
+    def stop(self) -> None:
+        """Stop the retention thread."""
+        self._stop.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=5.0)
+
+    def run_once(self) -> None:
+        """Run a single retention pass."""
+        try:
+            if not is_partitioned(engine):
+                raise RuntimeError("detection table is not partitioned")
+            ensure_partitions(engine, days_ahead=self.partition_days_ahead)
+            if self.detection_retention_days:
+                drop_expired_partitions(
+                    engine,
+                    retention_days=self.detection_retention_days,
+                    archive=self.archive_partitions,
+                )
+        except Exception as e:
+            logger.error(f"Error maintaining detection partitions: {e}")
+
+        try:
+            prune_snapshots(
+                self.snapshot_dir,
+                max_age_days=self.snapshot_max_age_days,
+                max_bytes=self.snapshot_max_bytes,
+            )
+            prune_snapshots(
+                os.path.join(self.snapshot_dir, CLIP_SUBDIR),
+                max_age_days=self.snapshot_max_age_days,
+                max_bytes=self.clip_max_bytes,
+                extensions=(".mp4",),
+            )
+        except Exception as e:
+            logger.error(f"Error pruning snapshots: {e}")
+
+    def _loop(self) -> None:
+        """Main retention loop."""
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
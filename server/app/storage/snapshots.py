@@ -0,0 +1,70 @@
+"""
+Snapshot retention for the snapshot directory.
+
+Snapshots are pruned oldest-first by modification time, either because they
+are older than the configured age or because the directory exceeds its total
+size budget.
+"""
+
+import os
+import time
+from typing import Iterable, List, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def prune_snapshots(
+    directory: str,
+    max_age_days: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+    extensions: Iterable[str] = (".jpg",),
+) -> List[str]:
+    """Delete old snapshots by age and/or total size budget.
+
+    Only regular files directly inside ``directory`` whose names end with one
+    of ``extensions`` are considered.
+
+    Args:
+        directory: Directory to prune
+        max_age_days: Delete files older than this many days. None or <= 0 disables
+        max_bytes: Delete oldest files until the total size fits. None disables
+        extensions: File suffixes to consider
+
+    Returns:
+        Names of the files that were deleted
+    """
+    extensions = tuple(extensions)
+    try:
+        entries = [
+            entry for entry in os.scandir(directory)
+            if entry.is_file() and entry.name.endswith(extensions)
+        ]
+    except FileNotFoundError:
+        return []
+
+    # Oldest first
+    files = sorted(
+        ((entry.stat().st_mtime, entry.stat().st_size, entry.name) for entry in entries)
+    )
+    total = sum(size for _, size, _ in files)
+    cutoff = time.time() - max_age_days * 86400 if max_age_days and max_age_days > 0 else None
+
+    deleted = []
+    for mtime, size, name in files:
+        too_old = cutoff is not None and mtime < cutoff
+        over_budget = max_bytes is not None and total > max_bytes
+        if not (too_old or over_budget):
+            break
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError as e:
+            logger.error(f"Error deleting snapshot {name}: {e}")
+            continue
+        total -= size
+        deleted.append(name)
+
+    if deleted:
+        logger.info(f"Pruned {len(deleted)} snapshot(s) from {directory}")
+    return deleted
@@ -4,13 +4,15 @@ Signal handlers for the detection system.
 This module contains all the handler functions that respond to various signals
 in the detection system.
 """
-import os, cv2
+import os, cv2, asyncio
 from uuid import UUID
 
 from app.utils.logger import get_logger
 from app.models import Detection
 from app.db import get_session
 from app.utils.signals import snapshot_made
+from app.rtsp.clips import ClipWriter
+from app.storage.derivatives import DerivativeCache
 
 logger = get_logger(__name__)
 
@@ -30,7 +32,10 @@ async def handle_snapshot_storage(sender, frame, **kwargs):
         
         # Save with good quality for detection images
         cv2.imwrite(filepath, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        logger.info(f"\nhandle_snapshot_storage:\nSaved high confidence detection snapshot: {filename}\n")
+        logger.info(
+            "Saved high confidence detection snapshot %s", filename,
+            extra={"event": "snapshot.saved", "camera_id": kwargs['camera_id']},
+        )
 
         await snapshot_made.send_async(
             sender, frame=frame, asset_path=filename
@@ -39,6 +44,39 @@ async def handle_snapshot_storage(sender, frame, **kwargs):
     except Exception as e:
         logger.error(f"Error saving detection snapshot: {e}")
 
+async def handle_clip_storage(sender, frame, **kwargs):
+    """Handle queuing a pre-roll/post-roll clip for high confidence detections."""
+    try:
+        stream = getattr(sender, "stream", None)
+        if stream is None:
+            return
+
+        timestamp_str = kwargs['timestamp'].strftime("%Y%m%d_%H%M%S")
+        filename = f"{timestamp_str}_{kwargs['camera_id']}_{kwargs['confidence']:.2f}_{kwargs['class_name']}.mp4"
+
+        ClipWriter().request(
+            stream,
+            event_ts=kwargs['timestamp'].timestamp(),
+            filename=filename,
+            sender=sender,
+            loop=getattr(sender, "loop", None),
+            camera_id=kwargs['camera_id'],
+        )
+
+    except Exception as e:
+        logger.error(f"Error queuing detection clip: {e}")
+
+async def handle_thumbnail_warmup(sender, frame, **kwargs):
+    """Handle pre-generating the carousel thumbnail for a new snapshot."""
+    try:
+        cache = DerivativeCache()
+        if source := cache.source_path(kwargs['asset_path']):
+            width = int(os.getenv("THUMBNAIL_WIDTH", 320))
+            await asyncio.to_thread(cache.get, source, width, "webp")
+
+    except Exception as e:
+        logger.error(f"Error generating snapshot thumbnail: {e}")
+
 async def handle_detection_storage(sender, frame, **kwargs):
     """Handle storing detection metadata in the database."""
     try:
@@ -53,12 +91,17 @@ async def handle_detection_storage(sender, frame, **kwargs):
             session.add(detection)
             session.commit()
             
-        # Log detection info
+        # Log detection info (rate limited, fields only rendered if emitted)
         logger.info(
-            f"\nhandle_detection_storage:\nDetection {kwargs['detection_id']} at {kwargs['timestamp']}: "
-            f"camera={kwargs['camera_id']}, model={kwargs['model_id']}, "
-            f"class={kwargs['class_name']}({kwargs['class_id']}), "
-            f"conf={kwargs['confidence']:.2f}\n"
+            "Stored detection %s", kwargs['detection_id'],
+            extra={
+                "event": "detection.stored",
+                "camera_id": kwargs['camera_id'],
+                "model_id": kwargs['model_id'],
+                "class_name": kwargs['class_name'],
+                "confidence": kwargs['confidence'],
+                "detection_timestamp": kwargs['timestamp'],
+            },
         )
         
     except Exception as e:
@@ -69,8 +112,11 @@ async def setup_handlers():
     from app.utils.signals import (
         detection_made,
         high_confidence_detection_made,
+        snapshot_made,
     )
     
     # Connect handlers to signals
     detection_made.connect(handle_detection_storage)
-    high_confidence_detection_made.connect(handle_snapshot_storage)
\ No newline at end of file
+    high_confidence_detection_made.connect(handle_snapshot_storage)
+    high_confidence_detection_made.connect(handle_clip_storage)
+    snapshot_made.connect(handle_thumbnail_warmup)
\ No newline at end of file
@@ -1,20 +1,192 @@
+"""
+Logging setup for the application.
+
+Records are handed to a queue by the calling thread and formatted / written
+by a background listener thread, so logging from the event loop or a
+detector thread never blocks on I/O. Before a record is queued it passes a
+sampling / rate-limiting filter keyed by its ``event`` (set with
+``extra={"event": ...}``), so high-volume hot-path events cost almost
+nothing once they're filtered out.
+
+Configuration (environment):
+    LOG_LEVEL        root log level (default INFO)
+    LOG_FORMAT       "json" (default) or "text"
+    LOG_SAMPLE_RATES JSON {event: fraction of records kept}
+    LOG_RATE_LIMITS  JSON {event: max records per second}
+"""
+
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+# Hot-path events that are rate limited unless overridden by LOG_RATE_LIMITS
+DEFAULT_RATE_LIMITS = {
+    "detection.stored": 5.0,
+    "snapshot.saved": 2.0,
+}
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict[str, object]:
+    """Fields passed through ``extra`` (and added by filters, e.g. ``suppressed``)."""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class TextFormatter(logging.Formatter):
+    """Classic text lines with any ``extra`` fields appended as key=value pairs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if not fields:
+            return line
+
+        # Keep a traceback (if any) after the fields
+        message, sep, traceback = line.partition("\n")
+        pairs = " ".join(f"{key}={value}" for key, value in fields.items())
+        return f"{message} | {pairs}{sep}{traceback}"
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(_extra_fields(record))
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Per-event sampling and token-bucket rate limiting.
+
+    Records without an ``event`` attribute always pass. Records that pass
+    after others of the same event were dropped carry a ``suppressed`` count.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+
+        # event -> [tokens, last refill time, suppressed count]
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        if event is None:
+            return True
+
+        rate = self.sample_rates.get(event)
+        if rate is not None and random.random() >= rate:
+            return False
+
+        limit = self.rate_limits.get(event)
+        if limit is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(event, [limit, now, 0])
+            bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stdlib version formats the message here, on the caller's
+        # thread; the in-process queue doesn't need a picklable record
+        return record
+
+
+def _json_env(name: str) -> Dict[str, float]:
+    try:
+        return {key: float(value) for key, value in json.loads(os.getenv(name, "{}")).items()}
+    except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        logging.getLogger(__name__).error(f"Error: {name} must be a JSON object of numbers")
+        return {}
+
+
+def _log_level() -> int:
+    name = (os.getenv("LOG_LEVEL") or "INFO").upper()
+    level = logging.getLevelName(name)
+    if not isinstance(level, int):
+        logging.getLogger(__name__).error(f"Error: unknown LOG_LEVEL {name!r}, using INFO")
+        return logging.INFO
+    return level
+
+
+def _configure() -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to a background writer thread."""
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        formatter = TextFormatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+    else:
+        formatter = JsonFormatter()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(
+        sample_rates=_json_env("LOG_SAMPLE_RATES"),
+        rate_limits={**DEFAULT_RATE_LIMITS, **_json_env("LOG_RATE_LIMITS")},
+    ))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(_log_level())
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # flush queued records on shutdown
+    return listener
+
+
+_listener = _configure()
 
-# Configure basic logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance for the specified module.
-    
+
     Args:
         name: Usually __name__ of the calling module
-        
+
     Returns:
         A configured logger instance
     """
-    return logging.getLogger(name) 
\ No newline at end of file
+    return logging.getLogger(name)
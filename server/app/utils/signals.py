@@ -9,4 +9,5 @@ from blinker import signal
 # Detection events
 detection_made = signal('detection.made')  # Emitted for any detection
 high_confidence_detection_made = signal('detection.high_confidence')  # Emitted only for high confidence detections
-snapshot_made = signal('snapshot.made')  # Emitted for any snapshot
\ No newline at end of file
+snapshot_made = signal('snapshot.made')  # Emitted for any snapshot
+clip_made = signal('clip.made')  # Emitted for any event clip